@@ -0,0 +1,37 @@
+"""Snapshot the bundled YAML config into src/gatekeep/_configs.json.
+
+The loader serves a bundled file from the snapshot instead of parsing it, as long as the
+file's content digest still matches. Re-run after editing any YAML under src/gatekeep/:
+
+    python scripts/precompile_configs.py
+
+Documents that JSON cannot represent exactly (dates, non-string keys) are left out and
+parsed at runtime.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import yaml
+
+PKG_DIR = Path(__file__).resolve().parent.parent / "src" / "gatekeep"
+SNAPSHOT = PKG_DIR / "_configs.json"
+
+
+def main() -> None:
+    snapshot = {}
+    for path in sorted(PKG_DIR.rglob("*.yaml")):
+        rel = path.relative_to(PKG_DIR).as_posix()
+        data = path.read_bytes()
+        doc = yaml.load(data, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+        if json.loads(json.dumps(doc)) != doc:
+            print(f"Skipping {rel}: not representable as JSON")
+            continue
+        snapshot[rel] = [hashlib.blake2b(data).hexdigest(), doc]
+    SNAPSHOT.write_text(json.dumps(snapshot, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Wrote {len(snapshot)} documents to {SNAPSHOT.relative_to(PKG_DIR.parent.parent)}")
+
+
+if __name__ == "__main__":
+    main()
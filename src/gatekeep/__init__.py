@@ -7,22 +7,52 @@ cost, architecture, and compliance standards.
 
 __version__ = "1.0.0"
 
-from .loader import (
-    load_personas,
-    load_governance,
-    load_standard,
-    get_persona_config,
-    load_all_for_persona,
-)
-
-from .personas import (
-    consult_persona,
-    consult_sync,
-    team_review,
-    team_review_sync,
-    deployment_gate,
-    route_question,
-)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .loader import (
+        load_personas,
+        load_governance,
+        load_standard,
+        get_persona_config,
+        load_all_for_persona,
+    )
+    from .personas import (
+        consult_persona,
+        consult_sync,
+        team_review,
+        team_review_sync,
+        deployment_gate,
+        route_question,
+        close_session,
+    )
+
+# Public names are imported on first use so `import gatekeep` (and the CLI) stays cheap
+_EXPORTS = {
+    "load_personas": "loader",
+    "load_governance": "loader",
+    "load_standard": "loader",
+    "get_persona_config": "loader",
+    "load_all_for_persona": "loader",
+    "consult_persona": "personas",
+    "consult_sync": "personas",
+    "team_review": "personas",
+    "team_review_sync": "personas",
+    "deployment_gate": "personas",
+    "route_question": "personas",
+    "close_session": "personas",
+}
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "load_personas",
@@ -36,4 +66,5 @@ __all__ = [
     "team_review_sync",
     "deployment_gate",
     "route_question",
+    "close_session",
 ]
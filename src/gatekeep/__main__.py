@@ -0,0 +1,6 @@
+"""Allow ``python -m gatekeep`` as an alias for the ``gatekeep`` command."""
+
+from .cli import cli
+
+if __name__ == "__main__":
+    cli(prog_name="gatekeep")
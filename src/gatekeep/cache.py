@@ -0,0 +1,102 @@
+"""Persistent LLM response cache — skip repeat calls for identical persona questions."""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+CACHE_PATH = Path.home() / ".gatekeep" / "cache.sqlite"
+DEFAULT_TTL = 24 * 60 * 60
+
+_enabled = True
+_conn: sqlite3.Connection | None = None
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn response caching on or off for this process."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """Return whether response caching is on."""
+    return _enabled
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the cache database, creating it on first use."""
+    global _conn
+    if _conn is None:
+        CACHE_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "system_hash TEXT NOT NULL, message_hash TEXT NOT NULL, model TEXT NOT NULL, "
+            "response TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (system_hash, message_hash, model))"
+        )
+    return _conn
+
+
+def close() -> None:
+    """Close the cache database if it is open."""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+
+def _digest(text: str) -> str:
+    """Hash a prompt for use as a key; surrogate-escaped text from non-UTF-8 input hashes too."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def get(model: str, system_prompt: str, message: str) -> str | None:
+    """Return a cached, unexpired response or None; an unusable cache counts as a miss."""
+    if not _enabled:
+        return None
+    try:
+        row = (
+            _connect()
+            .execute(
+                "SELECT response FROM responses "
+                "WHERE system_hash = ? AND message_hash = ? AND model = ? AND expires_at > ?",
+                (_digest(system_prompt), _digest(message), model, time.time()),
+            )
+            .fetchone()
+        )
+    except (sqlite3.Error, OSError):
+        return None
+    return row[0] if row else None
+
+
+def put(model: str, system_prompt: str, message: str, response: str, ttl: float = DEFAULT_TTL) -> None:
+    """Store a response for ``ttl`` seconds, pruning expired ones; skipped if the cache is unusable."""
+    if not _enabled:
+        return
+    now = time.time()
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (_digest(system_prompt), _digest(message), model, response, now + ttl),
+            )
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def clear() -> int:
+    """Delete every cached response, returning how many were removed.
+
+    Raises RuntimeError if the cache database cannot be opened or written.
+    """
+    if not CACHE_PATH.exists():
+        return 0
+    try:
+        conn = _connect()
+        with conn:
+            return conn.execute("DELETE FROM responses").rowcount
+    except (sqlite3.Error, OSError) as e:
+        raise RuntimeError(f"Could not clear the response cache: {e}") from e
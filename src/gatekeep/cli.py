@@ -1,20 +1,56 @@
 """Gatekeep CLI — consult personas, run reviews, and manage standards from the terminal."""
 
 import sys
-import asyncio
 
 import click
 from rich.console import Console
 from rich.table import Table
-from rich.panel import Panel
-from rich.markdown import Markdown
 
 from .loader import load_personas, load_versions, get_persona_config
-from .personas import consult_persona, team_review, deployment_gate, route_question
 
 console = Console()
 
 
+def _run(method: str, no_cache: bool = False, **params):
+    """Run a persona workflow on this directory's daemon if one is up, otherwise in-process.
+
+    Requests that bypass the response cache always run in-process, since the daemon's cache
+    setting is shared by every client. Only a failed connect falls back; once the daemon has
+    accepted the request, its errors are raised rather than running the workflow twice.
+    """
+    from . import daemon as background
+
+    if not no_cache:
+        try:
+            return background.call(method, **params)
+        except ConnectionError:
+            pass
+    from .personas import run_sync
+
+    return run_sync(background.get_methods()[method](**params))
+
+
+def _persona_label(persona_name: str) -> tuple[str, str]:
+    """Return (emoji, character) for a persona, falling back to a generic label."""
+    config = get_persona_config(persona_name) or {}
+    return config.get("emoji", "👤"), config.get("character", persona_name)
+
+
+def _render_persona_panel(persona_name: str, response: str) -> None:
+    """Print a persona's response as a Markdown panel titled with its emoji and character."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    emoji, character = _persona_label(persona_name)
+    console.print(Panel(Markdown(str(response)), title=f"{emoji} {character}"))
+
+
+def _report_skipped_prompts(skipped: dict[str, str]) -> None:
+    """Warn about personas whose prompt could not be precompiled."""
+    for name, reason in skipped.items():
+        console.print(f"  [yellow]! Skipped prompt for {name}: {reason}[/yellow]")
+
+
 @click.group()
 @click.version_option(package_name="gatekeep-ai")
 def cli():
@@ -26,7 +62,8 @@ def cli():
 @click.argument("persona")
 @click.argument("question", nargs=-1, required=True)
 @click.option("--context", "-c", help="Additional context")
-def ask(persona: str, question: tuple, context: str):
+@click.option("--no-cache", is_flag=True, help="Bypass the local response cache")
+def ask(persona: str, question: tuple, context: str, no_cache: bool):
     """Ask a persona a question.
 
     Examples:
@@ -35,19 +72,21 @@ def ask(persona: str, question: tuple, context: str):
         gatekeep ask architect "Should I use DynamoDB or RDS?"
     """
     question_text = " ".join(question)
-    config = get_persona_config(persona.lower())
-    if not config:
+    from . import cache as response_cache
+
+    response_cache.set_enabled(not no_cache)
+    persona_name = persona.lower()
+    if not get_persona_config(persona_name):
         console.print(f"[red]Unknown persona: {persona}[/red]")
         console.print("Run [bold]gatekeep personas[/bold] to see available personas.")
         sys.exit(1)
 
-    emoji = config.get("emoji", "👤")
-    character = config.get("character", persona)
+    emoji, character = _persona_label(persona_name)
     console.print(f"\n{emoji} Consulting {character}...\n")
 
     try:
-        response = asyncio.run(consult_persona(persona.lower(), question_text, context))
-        console.print(Panel(Markdown(response), title=f"{emoji} {character}"))
+        response = _run("ask", no_cache, persona_name=persona_name, question=question_text, context=context)
+        _render_persona_panel(persona_name, response)
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         sys.exit(1)
@@ -56,22 +95,23 @@ def ask(persona: str, question: tuple, context: str):
 @cli.command()
 @click.argument("content", nargs=-1, required=True)
 @click.option("--context", "-c", help="Additional context")
-def review(content: tuple, context: str):
+@click.option("--no-cache", is_flag=True, help="Bypass the local response cache")
+def review(content: tuple, context: str, no_cache: bool):
     """Run a team review (Auditor + Sentinel + Architect in parallel).
 
     Example:
         gatekeep review "My deployment plan for the new API"
     """
     content_text = " ".join(content)
+    from . import cache as response_cache
+
+    response_cache.set_enabled(not no_cache)
     console.print("\n🎯 Running Gatekeep Team Review...\n")
 
     try:
-        results = asyncio.run(team_review(content_text, context))
+        results = _run("review", no_cache, content=content_text, context=context)
         for persona_name, response in results.items():
-            config = get_persona_config(persona_name)
-            emoji = config.get("emoji", "👤") if config else "👤"
-            character = config.get("character", persona_name) if config else persona_name
-            console.print(Panel(Markdown(response), title=f"{emoji} {character}"))
+            _render_persona_panel(persona_name, response)
             console.print()
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -83,7 +123,7 @@ def review(content: tuple, context: str):
 @click.option("--env", "-e", required=True, type=click.Choice(["test", "production"]))
 @click.option("--context", "-c", help="Additional context")
 def deploy(plan: tuple, env: str, context: str):
-    """Run a deployment gate check.
+    """Run a deployment gate check. Gate decisions are never served from the response cache.
 
     Example:
         gatekeep deploy "New API version 2.0" --env production
@@ -92,21 +132,14 @@ def deploy(plan: tuple, env: str, context: str):
     console.print(f"\n🚀 Running Deployment Gate for {env.upper()}...\n")
 
     try:
-        result = asyncio.run(deployment_gate(plan_text, env, context))
+        result = _run("deploy", deployment_plan=plan_text, environment=env, context=context)
 
         console.print("[bold]Pre-Deployment Checks:[/bold]\n")
         for persona_name, response in result["checks"].items():
-            config = get_persona_config(persona_name)
-            emoji = config.get("emoji", "👤") if config else "👤"
-            character = config.get("character", persona_name) if config else persona_name
-            console.print(Panel(Markdown(response), title=f"{emoji} {character}"))
-
-        approver = result["approver"]
-        config = get_persona_config(approver)
-        emoji = config.get("emoji", "👤") if config else "👤"
-        character = config.get("character", approver) if config else approver
+            _render_persona_panel(persona_name, response)
+
         console.print(f"\n[bold]Approval Decision ({env.upper()}):[/bold]\n")
-        console.print(Panel(Markdown(result["approval"]), title=f"{emoji} {character}"))
+        _render_persona_panel(result["approver"], result["approval"])
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         sys.exit(1)
@@ -124,10 +157,8 @@ def route(question: tuple):
     console.print("\n🧭 Guide is thinking...\n")
 
     try:
-        persona = asyncio.run(route_question(question_text))
-        config = get_persona_config(persona)
-        emoji = config.get("emoji", "👤") if config else "👤"
-        character = config.get("character", persona) if config else persona
+        persona = _run("route", question=question_text)
+        emoji, character = _persona_label(persona)
         console.print(f'Guide says: "Talk to {emoji} {character} about that."\n')
         console.print(f'[dim]Run: gatekeep ask {persona} "{question_text}"[/dim]')
     except Exception as e:
@@ -183,6 +214,85 @@ def standards_status():
     console.print(table)
 
 
+@cli.group()
+def cache():
+    """Manage the local response cache."""
+
+
+@cache.command(name="clear")
+def cache_clear():
+    """Delete all cached persona responses."""
+    from . import cache as response_cache
+
+    try:
+        removed = response_cache.clear()
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    console.print(f"🧹 Cleared {removed} cached response(s).")
+
+
+@cli.group()
+def daemon():
+    """Manage the background daemon that keeps caches warm between commands."""
+
+
+@daemon.command(name="start")
+def daemon_start():
+    """Start a daemon serving the current directory."""
+    import time
+
+    from . import daemon as background
+
+    if not background.is_supported():
+        console.print("[red]The daemon needs Unix domain sockets, which this platform lacks.[/red]")
+        sys.exit(1)
+    if background.is_running():
+        console.print("· Daemon already running for this directory")
+        return
+    background.start()
+    for _ in range(50):
+        if background.is_running():
+            console.print("  ✓ Daemon started")
+            return
+        time.sleep(0.1)
+    console.print("[red]Daemon did not start within 5 seconds.[/red]")
+    sys.exit(1)
+
+
+@daemon.command(name="stop")
+def daemon_stop():
+    """Stop the daemon serving the current directory."""
+    from . import daemon as background
+
+    try:
+        background.stop()
+    except ConnectionError:
+        console.print("· No daemon running for this directory")
+        return
+    console.print("  ✓ Daemon stopped")
+
+
+@cli.group()
+def prompts():
+    """Manage precompiled persona system prompts."""
+
+
+@prompts.command(name="rebuild")
+def prompts_rebuild():
+    """Regenerate governance/.prompts/ from the project's current config."""
+    from pathlib import Path
+
+    from .personas import write_prompt_files
+
+    if not (Path.cwd() / "governance").is_dir():
+        console.print("[red]No project-local governance/ found.[/red] Run [bold]gatekeep init[/bold] first.")
+        sys.exit(1)
+    names, skipped = write_prompt_files()
+    console.print(f"  ✓ Rebuilt {len(names)} persona prompt(s) in governance/.prompts/")
+    _report_skipped_prompts(skipped)
+
+
 @cli.command()
 def init():
     """Initialize Gatekeep in the current project (creates governance/ and gatekeep.yaml)."""
@@ -202,6 +312,15 @@ def init():
         elif dst.exists():
             console.print(f"  · {subdir}/ already exists, skipping")
 
+    # Precompile persona prompts against the project-local config
+    from .loader import reset_paths
+    from .personas import write_prompt_files
+
+    reset_paths()
+    _, skipped = write_prompt_files()
+    console.print("  ✓ Precompiled persona prompts in governance/.prompts/")
+    _report_skipped_prompts(skipped)
+
     # Create gatekeep.yaml
     yaml_path = cwd / "gatekeep.yaml"
     if not yaml_path.exists():
@@ -0,0 +1,171 @@
+"""Background daemon — keeps config, prompt, and HTTP caches warm across CLI invocations.
+
+The daemon listens on a Unix socket and speaks newline-delimited JSON: each request is
+``{"method": ..., "params": {...}}`` and each reply is ``{"result": ...}`` or ``{"error": ...}``.
+Config is resolved relative to the working directory, so each project directory gets its own
+daemon and socket.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+SOCKET_DIR = Path.home() / ".gatekeep"
+
+# Largest single request or reply line accepted, in bytes
+_LINE_LIMIT = 16 * 1024 * 1024
+
+# Seconds to wait for the daemon to accept a connection, and for a workflow's reply
+CONNECT_TIMEOUT = 5
+REPLY_TIMEOUT = 300
+
+
+def socket_path() -> Path:
+    """Return the socket path for the daemon serving the current directory."""
+    digest = hashlib.blake2b(os.getcwd().encode(), digest_size=8).hexdigest()
+    return SOCKET_DIR / f"daemon-{digest}.sock"
+
+
+def get_methods() -> dict[str, Any]:
+    """Return the persona workflows the daemon can run, keyed by method name."""
+    from . import personas
+
+    return {
+        "ask": personas.consult_persona,
+        "review": personas.team_review,
+        "deploy": personas.deployment_gate,
+        "route": personas.route_question,
+    }
+
+
+def is_supported() -> bool:
+    """Return whether this platform has Unix domain sockets."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def call(method: str, **params: Any) -> Any:
+    """Run a method on the daemon serving the current directory.
+
+    Raises ConnectionError only when no daemon accepted the connection, so the request was
+    never sent. Any failure after that — including the method itself failing inside the
+    daemon, a timeout, or a broken reply — raises RuntimeError, since the method may have run.
+    """
+    if not is_supported():
+        raise ConnectionError("Unix sockets are not available on this platform")
+    request = json.dumps({"method": method, "params": params}).encode() + b"\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(socket_path()))
+        except OSError as e:
+            raise ConnectionError(f"Gatekeep daemon not reachable: {e}") from e
+        sock.settimeout(REPLY_TIMEOUT)
+        try:
+            sock.sendall(request)
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        except OSError as e:
+            raise RuntimeError(f"Gatekeep daemon connection failed: {e}") from e
+    if not line:
+        raise RuntimeError("Gatekeep daemon closed the connection")
+    try:
+        reply = json.loads(line)
+        error, result = reply.get("error"), reply.get("result")
+    except (ValueError, AttributeError) as e:
+        raise RuntimeError(f"Gatekeep daemon sent a malformed reply: {e}") from e
+    if error is not None:
+        raise RuntimeError(error)
+    return result
+
+
+def is_running() -> bool:
+    """Return whether a daemon is answering for the current directory."""
+    try:
+        call("ping")
+    except (ConnectionError, RuntimeError):
+        return False
+    return True
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, shutdown: asyncio.Event) -> None:
+    """Serve one request on a client connection."""
+    from .loader import reset_paths
+
+    try:
+        request = json.loads(await reader.readline())
+        # Re-resolve the config root so a `gatekeep init` run after the daemon started takes effect.
+        reset_paths()
+        method = request.get("method")
+        methods = get_methods()
+        if method == "ping":
+            reply = {"result": "pong"}
+        elif method == "shutdown":
+            reply = {"result": "stopping"}
+            shutdown.set()
+        elif method in methods:
+            reply = {"result": await methods[method](**request.get("params", {}))}
+        else:
+            reply = {"error": f"Unknown method: {method}"}
+    except Exception as e:  # noqa: BLE001 - any workflow failure is reported to the client, not fatal to the daemon
+        reply = {"error": str(e)}
+    try:
+        writer.write(json.dumps(reply, default=str).encode() + b"\n")
+        await writer.drain()
+    except ConnectionError:
+        pass  # Client went away before reading its reply
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve() -> None:
+    """Listen on the daemon socket until a shutdown request arrives."""
+    from .personas import close_session
+
+    path = socket_path()
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    shutdown = asyncio.Event()
+    # Bind under a private umask so the socket is never reachable by other users, not even briefly.
+    umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(
+            lambda r, w: _handle(r, w, shutdown), path=str(path), limit=_LINE_LIMIT
+        )
+    finally:
+        os.umask(umask)
+    try:
+        async with server:
+            await shutdown.wait()
+    finally:
+        await close_session()
+        path.unlink(missing_ok=True)
+
+
+def start() -> None:
+    """Launch the daemon as a detached background process in the current directory."""
+    subprocess.Popen(
+        [sys.executable, "-m", "gatekeep.daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def stop() -> None:
+    """Ask the daemon serving the current directory to shut down."""
+    call("shutdown")
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -1,22 +1,59 @@
 """Configuration loader for governance policies, standards, and persona definitions."""
 
-import yaml
+import functools
+import hashlib
+import importlib.resources
+import itertools
+import json
+import warnings
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any, Optional
 
+import yaml
+
+# Resolved once at import; the loader stats bundled files by mtime, so they must live on a real filesystem.
+_PKG_DIR = Path(importlib.resources.files(__package__))
+
+# Prefer libyaml's C implementations; output is identical to the pure-Python ones.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+if _Loader is yaml.SafeLoader:
+    warnings.warn(
+        "PyYAML was built without libyaml; falling back to the slower pure-Python parser. "
+        "Reinstall PyYAML with libyaml available for faster config loading.",
+        RuntimeWarning,
+        stacklevel=2,
+    )
+
 
+@functools.lru_cache(maxsize=1)
 def _find_config_root() -> Path:
     """Find the configuration root directory.
 
     Searches for governance files in this order:
     1. ./governance/ (project-local)
     2. Package-bundled defaults
+
+    The result is cached for the life of the process; call reset_paths() after changing
+    directory or creating a project-local governance/ directory.
     """
     cwd = Path.cwd()
     if (cwd / "governance").is_dir():
         return cwd
     # Fall back to package-bundled config
-    return Path(__file__).parent
+    return _PKG_DIR
+
+
+def reset_paths() -> None:
+    """Forget the cached configuration root so the next lookup re-resolves it."""
+    _find_config_root.cache_clear()
+
+
+def get_prompts_dir() -> Path:
+    """Return the directory holding precompiled persona system prompts."""
+    return _find_config_root() / "governance" / ".prompts"
 
 
 def _get_paths() -> tuple[Path, Path, Path, Path]:
@@ -25,12 +62,69 @@ def _get_paths() -> tuple[Path, Path, Path, Path]:
     return base, base / "governance", base / "standards", base / "personas"
 
 
+# Parsed YAML documents keyed by path, tagged with the (mtime_ns, size) they were parsed at.
+_cache: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+
+# Dumped YAML text keyed by id() of the loaded document; the document is kept alongside so the id stays valid.
+_dump_cache: dict[int, tuple[Any, str]] = {}
+
+
+def clear_cache() -> None:
+    """Drop all memoized YAML documents and persona bundles."""
+    _cache.clear()
+    _dump_cache.clear()
+    _persona_bundle.cache_clear()
+
+
 def load_yaml(path: Path) -> dict[str, Any]:
-    """Load a YAML file, returning empty dict if missing."""
-    if not path.exists():
+    """Load a YAML file, returning empty dict if missing.
+
+    Results are memoized per path and reused until the file's mtime or size changes.
+    Callers must treat the returned dict as read-only.
+    """
+    try:
+        st = path.stat()
+    except OSError:
         return {}
-    with open(path) as f:
-        return yaml.safe_load(f) or {}
+    key = str(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    data = _parse_yaml(path)
+    _cache[key] = (signature, data)
+    return data
+
+
+# Build-time snapshot of the bundled YAML, written by scripts/precompile_configs.py
+_SNAPSHOT_PATH = _PKG_DIR / "_configs.json"
+
+
+@functools.cache
+def _snapshot() -> dict[str, tuple[str, Any]]:
+    """Load the bundled config snapshot, mapping package-relative path to (blake2b digest, document)."""
+    try:
+        entries = json.loads(_SNAPSHOT_PATH.read_bytes())
+        return {rel: (digest, doc) for rel, (digest, doc) in entries.items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        # Missing or malformed snapshot: every file is parsed instead
+        return {}
+
+
+def _parse_yaml(path: Path) -> dict[str, Any]:
+    """Parse a YAML file, taking bundled files from the snapshot while their content still matches.
+
+    Only paths under the package directory are looked up; project config is always parsed.
+    """
+    try:
+        entry = _snapshot().get(path.relative_to(_PKG_DIR).as_posix())
+    except ValueError:
+        entry = None
+    raw = path.read_bytes()
+    if entry is not None and hashlib.blake2b(raw).hexdigest() == entry[0]:
+        return entry[1]
+    return yaml.load(raw, Loader=_Loader) or {}
 
 
 def load_governance(files: list[str]) -> dict[str, Any]:
@@ -44,6 +138,11 @@ def load_governance(files: list[str]) -> dict[str, Any]:
     return governance
 
 
+def _standard_files(manifest: dict[str, Any]) -> list[str]:
+    """Return the domain filenames listed in a standard's manifest."""
+    return manifest.get("standard", {}).get("files", []) or manifest.get("files", [])
+
+
 def load_standard(standard_id: str) -> dict[str, Any]:
     """Load a complete regulatory standard by ID."""
     _, _, standards_dir, _ = _get_paths()
@@ -56,8 +155,7 @@ def load_standard(standard_id: str) -> dict[str, Any]:
         return {}
 
     standard: dict[str, Any] = {"manifest": manifest, "domains": {}}
-    files = manifest.get("standard", {}).get("files", []) or manifest.get("files", [])
-    for filename in files:
+    for filename in _standard_files(manifest):
         domain_path = standard_dir / filename
         if domain_path.exists():
             domain_name = filename.replace(".yaml", "")
@@ -104,32 +202,86 @@ def get_persona_standards(persona_name: str) -> dict[str, Any]:
     return standards
 
 
+def get_persona_sources(persona_name: str) -> list[Path]:
+    """List the YAML files that feed a persona's config, governance, and standards."""
+    _, governance_dir, standards_dir, personas_dir = _get_paths()
+    sources = [personas_dir / "personas.yaml"]
+    config = get_persona_config(persona_name)
+    if not config:
+        return sources
+    sources.extend(governance_dir / filename for filename in config.get("governance", []))
+    for standard_id in config.get("standards", []):
+        manifest_path = standards_dir / standard_id / "manifest.yaml"
+        sources.append(manifest_path)
+        sources.extend(standards_dir / standard_id / f for f in _standard_files(load_yaml(manifest_path)))
+    return sources
+
+
+def sources_signature(paths: list[Path]) -> tuple[tuple[str, int, int], ...]:
+    """Fingerprint files by (path, mtime_ns, size); missing files fingerprint as (path, 0, -1)."""
+    signature = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            signature.append((str(path), 0, -1))
+        else:
+            signature.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def _dump_yaml(content: Any) -> str:
+    """Dump a loaded YAML document, memoized by identity since loader results are shared and read-only."""
+    entry = _dump_cache.get(id(content))
+    if entry is None or entry[0] is not content:
+        if len(_dump_cache) >= 128:
+            _dump_cache.clear()
+        entry = (content, yaml.dump(content, Dumper=_Dumper, default_flow_style=False))
+        _dump_cache[id(content)] = entry
+    return entry[1]
+
+
 def format_governance_for_prompt(governance: dict[str, Any]) -> str:
-    """Format governance rules for inclusion in an LLM prompt."""
+    """Format governance rules for inclusion in an LLM prompt.
+
+    Files are emitted in sorted order so the same rules always produce the same bytes.
+    """
     if not governance:
         return "No specific governance rules loaded."
     sections = []
-    for filename, content in governance.items():
+    for filename, content in sorted(governance.items()):
         sections.append(f"# {filename}")
-        sections.append(yaml.dump(content, default_flow_style=False))
+        sections.append(_dump_yaml(content))
     return "\n\n".join(sections)
 
 
+def _iter_controls(controls: Any) -> Iterator[dict[str, Any]]:
+    """Yield controls from a flat list, or from named groups that each hold a ``controls`` list."""
+    if isinstance(controls, dict):
+        for group in controls.values():
+            yield from (group or {}).get("controls") or ()
+    else:
+        yield from controls or ()
+
+
 def format_standards_for_prompt(standards: dict[str, Any]) -> str:
-    """Format regulatory standards for inclusion in an LLM prompt."""
+    """Format regulatory standards for inclusion in an LLM prompt.
+
+    Standards and domains are emitted in sorted order so the same standards always produce
+    the same bytes, whatever order they were loaded in.
+    """
     if not standards:
         return "No regulatory standards applicable."
     sections = []
-    for standard_id, content in standards.items():
+    for standard_id, content in sorted(standards.items()):
         manifest = content.get("manifest", {}).get("standard", {})
         sections.append(f"# {manifest.get('name', standard_id)} (v{manifest.get('version', 'unknown')})")
-        for domain_name, domain_content in content.get("domains", {}).items():
+        for domain_name, domain_content in sorted(content.get("domains", {}).items()):
             sections.append(f"\n## {domain_name}")
-            for control in domain_content.get("controls", [])[:10]:
-                ctrl_id = control.get("id", "")
-                requirement = control.get("requirement", "")
-                severity = control.get("severity", "")
-                sections.append(f"- [{ctrl_id}] ({severity}) {requirement}")
+            sections.extend(
+                f"- [{c.get('id', '')}] ({c.get('severity', '')}) {c.get('requirement', '')}"
+                for c in itertools.islice(_iter_controls(domain_content.get("controls")), 10)
+            )
     return "\n".join(sections)
 
 
@@ -146,7 +298,16 @@ def get_workflows() -> dict[str, Any]:
 
 
 def load_all_for_persona(persona_name: str) -> dict[str, Any]:
-    """Load everything needed for a persona: config, governance, standards, and formatted prompts."""
+    """Load everything needed for a persona: config, governance, standards, and formatted prompts.
+
+    The result is shared between callers and rebuilt only when one of the persona's source files changes.
+    """
+    return _persona_bundle(persona_name, sources_signature(get_persona_sources(persona_name)))
+
+
+@functools.lru_cache(maxsize=32)
+def _persona_bundle(persona_name: str, signature: tuple) -> dict[str, Any]:
+    """Assemble a persona's bundle; ``signature`` only keys the cache."""
     config = get_persona_config(persona_name)
     if not config:
         return {}
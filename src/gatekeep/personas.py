@@ -1,61 +1,242 @@
 """Persona engine — character-driven LLM specialists that enforce governance and standards."""
 
 import asyncio
+import functools
+import hashlib
+import json
 import os
-from typing import Any, Optional
-
-import aiohttp
-
+import re
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+if TYPE_CHECKING:
+    import aiohttp
+
+try:
+    import ahocorasick
+except ImportError:  # optional accelerator, see the "fast" extra
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # optional accelerator, see the "fast" extra
+    orjson = None
+
+from . import __version__
+from . import cache as response_cache
 from .loader import (
     load_all_for_persona,
     get_persona_config,
-    load_personas,
     get_routing_rules,
+    get_workflows,
+    get_persona_sources,
+    get_prompts_dir,
+    load_personas,
+    sources_signature,
 )
 
+T = TypeVar("T")
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+_ENV_KEY_RE = re.compile(rb"^OPENROUTER_API_KEY=(.*)$", re.MULTILINE)
+
+
+def _read_env_key(env_path: Path) -> str | None:
+    """Return the first usable OPENROUTER_API_KEY value in a .env file, if any."""
+    try:
+        data = env_path.read_bytes()
+    except OSError:
+        return None
+    for match in _ENV_KEY_RE.finditer(data):
+        val = match.group(1).decode(errors="replace").strip().strip('"').strip("'")
+        if val and val != "your_openrouter_api_key_here":
+            return val
+    return None
+
 
 def get_api_key() -> str:
     """Get OpenRouter API key from environment or .env file."""
     key = os.getenv("OPENROUTER_API_KEY")
     if key:
         return key
-    # Try local .env
-    from pathlib import Path
-
+    # Try local .env, then the user-level one
     for env_path in [Path.cwd() / ".env", Path.home() / ".gatekeep" / ".env"]:
-        if env_path.exists():
-            for line in env_path.read_text().splitlines():
-                if line.startswith("OPENROUTER_API_KEY="):
-                    val = line.split("=", 1)[1].strip().strip('"').strip("'")
-                    if val and val != "your_openrouter_api_key_here":
-                        return val
+        val = _read_env_key(env_path)
+        if val:
+            return val
     raise ValueError("OPENROUTER_API_KEY not found. Set it as an environment variable or in a .env file.")
 
 
 _API_KEY: Optional[str] = None
+_session: "aiohttp.ClientSession | None" = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+# Closes _session when its event loop shuts down; see _close_on_shutdown
+_session_guard: AsyncGenerator[None, None] | None = None
+
+
+async def _close_on_shutdown(session: "aiohttp.ClientSession") -> AsyncGenerator[None, None]:
+    """Keep ``session`` open until this generator is finalized, then close it.
+
+    Event loops finalize unfinished async generators in shutdown_asyncgens(), which asyncio.run()
+    calls before closing the loop, so the session is closed even for callers that run the async
+    API under their own asyncio.run() and never call close_session().
+    """
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+def _discard_session(session: "aiohttp.ClientSession", loop: asyncio.AbstractEventLoop) -> None:
+    """Close a session left open by another event loop, on that loop."""
+    if not session.closed and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+
+async def _get_session() -> "aiohttp.ClientSession":
+    """Return the shared OpenRouter session, creating it for the running event loop if needed."""
+    global _session, _session_loop, _session_guard, _API_KEY
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        import aiohttp  # deferred: only needed once a real LLM call is made
+
+        if _session is not None and _session_loop is not loop:
+            _discard_session(_session, _session_loop)
+        if not _API_KEY:
+            _API_KEY = get_api_key()
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=60),
+            headers={
+                "Authorization": f"Bearer {_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+        _session_loop = loop
+        _session_guard = _close_on_shutdown(_session)
+        await _session_guard.__anext__()
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared OpenRouter session, if one is open.
+
+    asyncio.run() closes the session on its own; call this when driving a long-lived event loop
+    that should release its connections before it shuts down.
+    """
+    global _session, _session_loop, _session_guard
+    session, loop, guard = _session, _session_loop, _session_guard
+    _session = _session_loop = _session_guard = None
+    if session is None:
+        return
+    if loop is asyncio.get_running_loop():
+        await guard.aclose()
+    else:
+        _discard_session(session, loop)
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on a fresh event loop, closing the shared session before the loop shuts down."""
+
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await close_session()
+
+    return asyncio.run(_main())
 
 
 def build_system_prompt(persona_name: str) -> str:
-    """Build the system prompt for a persona, including governance and standards context."""
+    """Build the system prompt for a persona, including governance and standards context.
+
+    Prompts are memoized per persona and rebuilt only when one of the persona's source files
+    changes. The layout is load-bearing: character and traits first, then governance and
+    standards (each in sorted order), then the fixed response style, while the question and
+    context travel in the user message. Keeping the prompt byte-identical across calls and
+    processes is what lets provider-side prompt caches hit.
+    """
+    return _build_system_prompt_cached(persona_name, sources_signature(get_persona_sources(persona_name)))
+
+
+@functools.lru_cache(maxsize=32)
+def _build_system_prompt_cached(persona_name: str, signature: tuple) -> str:
+    """Return the precompiled prompt if it was built from ``signature``, else assemble it."""
+    if not get_persona_config(persona_name):
+        raise ValueError(f"Unknown persona: {persona_name}")
+    prompts_dir = get_prompts_dir()
+    try:
+        if (prompts_dir / f"{persona_name}.hash").read_text(encoding="utf-8") == _signature_digest(signature):
+            return (prompts_dir / f"{persona_name}.txt").read_text(encoding="utf-8")
+    except OSError:
+        pass
+    return _assemble_system_prompt(persona_name)
+
+
+def clear_prompt_cache() -> None:
+    """Drop memoized system prompts, e.g. after editing config within the same second."""
+    _build_system_prompt_cached.cache_clear()
+
+
+# Bump whenever _assemble_system_prompt or the loader's formatters change their output, so
+# precompiled prompts from an older layout are rebuilt instead of served.
+_PROMPT_FORMAT = 1
+
+
+def _signature_digest(signature: tuple) -> str:
+    """Fingerprint a persona's sources together with the code version that formats them."""
+    return hashlib.blake2b(repr((__version__, _PROMPT_FORMAT, signature)).encode(), digest_size=16).hexdigest()
+
+
+def write_prompt_files() -> tuple[list[str], dict[str, str]]:
+    """Precompile every persona's system prompt into governance/.prompts/.
+
+    Each ``<persona>.txt`` is paired with a ``<persona>.hash`` fingerprint of its source files;
+    build_system_prompt uses the text only while the fingerprint still matches. Personas whose
+    definition is missing a required field are skipped; returns (written, {skipped: reason}).
+    """
+    prompts_dir = get_prompts_dir()
+    prompts_dir.mkdir(parents=True, exist_ok=True)
+    written, skipped = [], {}
+    for name in load_personas().get("personas", {}):
+        signature = sources_signature(get_persona_sources(name))
+        try:
+            prompt = _assemble_system_prompt(name)
+        except KeyError as e:
+            skipped[name] = f"missing field {e}"
+            (prompts_dir / f"{name}.txt").unlink(missing_ok=True)
+            (prompts_dir / f"{name}.hash").unlink(missing_ok=True)
+            continue
+        (prompts_dir / f"{name}.txt").write_text(prompt, encoding="utf-8")
+        (prompts_dir / f"{name}.hash").write_text(_signature_digest(signature), encoding="utf-8")
+        written.append(name)
+    return written, skipped
+
+
+def _assemble_system_prompt(persona_name: str) -> str:
+    """Assemble a persona's system prompt from its config, governance, and standards."""
     data = load_all_for_persona(persona_name)
     if not data:
         raise ValueError(f"Unknown persona: {persona_name}")
 
     config = data["config"]
-    prompt = f"""You are {config["character"]}, providing {config["domain"]} guidance.
-
-CHARACTER TRAITS:
-{config["traits"]}
-
-"""
+    parts = [
+        f"You are {config['character']}, providing {config['domain']} guidance.\n\n",
+        f"CHARACTER TRAITS:\n{config['traits']}\n\n",
+    ]
     if data["governance_text"] != "No specific governance rules loaded.":
         mode = config.get("governance_mode", "standard")
-        prompt += f"ORGANIZATIONAL GOVERNANCE ({mode.upper()} enforcement):\n{data['governance_text']}\n\n"
-
+        parts.append(f"ORGANIZATIONAL GOVERNANCE ({mode.upper()} enforcement):\n{data['governance_text']}\n\n")
     if data["standards_text"] != "No regulatory standards applicable.":
-        prompt += f"REGULATORY STANDARDS (MUST ENFORCE):\n{data['standards_text']}\n\n"
+        parts.append(f"REGULATORY STANDARDS (MUST ENFORCE):\n{data['standards_text']}\n\n")
+    parts.append(_RESPONSE_STYLE)
+    return "".join(parts)
 
-    prompt += """RESPONSE STYLE:
+
+_RESPONSE_STYLE = """RESPONSE STYLE:
 - Stay in character with appropriate personality
 - Enforce governance and standards strictly
 - Provide actionable, domain-specific advice
@@ -63,61 +244,109 @@ CHARACTER TRAITS:
 - Be helpful but maintain character voice
 - Keep responses focused and concise
 """
-    return prompt
 
 
-async def query_llm(model: str, system_prompt: str, user_prompt: str, context: Optional[str] = None) -> str:
-    """Query an LLM via OpenRouter."""
-    global _API_KEY
-    if not _API_KEY:
-        _API_KEY = get_api_key()
+# Providers that only cache prompt prefixes explicitly marked with cache_control; OpenAI and others cache automatically.
+_CACHE_CONTROL_PREFIXES = ("anthropic/", "google/")
 
-    message = f"Context: {context}\n\n{user_prompt}" if context else user_prompt
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
+def _system_message(model: str, system_prompt: str, prompt_cache: bool) -> dict[str, Any]:
+    """Build the system message, marking it cacheable for providers that need an explicit breakpoint."""
+    if prompt_cache and model.startswith(_CACHE_CONTROL_PREFIXES):
+        return {
+            "role": "system",
+            "content": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        }
+    return {"role": "system", "content": system_prompt}
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a request body, with orjson when available.
+
+    orjson rejects lone surrogates and non-str keys, so those bodies fall back to the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a response body, with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+async def query_llm(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    context: Optional[str] = None,
+    prompt_cache: bool = True,
+    use_cache: bool = True,
+) -> str:
+    """Query an LLM via OpenRouter.
+
+    With ``prompt_cache`` set, the system prompt is flagged for provider-side prompt caching.
+    With ``use_cache`` set, responses are also served from and stored in the local response
+    cache while it is enabled.
+    """
+    message = f"Context: {context}\n\n{user_prompt}" if context else user_prompt
+    if use_cache:
+        cached = response_cache.get(model, system_prompt, message)
+        if cached is not None:
+            return cached
+
+    session = await _get_session()
+    async with session.post(
+        OPENROUTER_URL,
+        data=_json_dumps(
+            {
                 "model": model,
                 "messages": [
-                    {"role": "system", "content": system_prompt},
+                    _system_message(model, system_prompt, prompt_cache),
                     {"role": "user", "content": message},
                 ],
-            },
-            timeout=aiohttp.ClientTimeout(total=60),
-        ) as response:
-            if response.status != 200:
-                text = await response.text()
-                raise RuntimeError(f"OpenRouter API error {response.status}: {text}")
-            result = await response.json()
-            return result["choices"][0]["message"]["content"]
-
-
-async def consult_persona(persona_name: str, question: str, context: Optional[str] = None) -> str:
-    """Consult a persona with a question."""
+            }
+        ),
+    ) as response:
+        if response.status != 200:
+            text = await response.text()
+            raise RuntimeError(f"OpenRouter API error {response.status}: {text}")
+        result = _json_loads(await response.read())
+        content = result["choices"][0]["message"]["content"]
+    if use_cache:
+        response_cache.put(model, system_prompt, message, content)
+    return content
+
+
+async def consult_persona(
+    persona_name: str, question: str, context: Optional[str] = None, use_cache: bool = True
+) -> str:
+    """Consult a persona with a question; ``use_cache=False`` always asks the model afresh."""
     config = get_persona_config(persona_name)
     if not config:
         raise ValueError(f"Unknown persona: {persona_name}")
 
-    system_prompt = build_system_prompt(persona_name)
     model = config.get("model", "anthropic/claude-3.5-sonnet")
-
     if model == "consensus":
-        return await _consensus_review(persona_name, question, context)
-    return await query_llm(model, system_prompt, question, context)
+        return await _consensus_review(persona_name, question, context, use_cache)
+
+    # Prompt assembly reads YAML from disk on a cold cache; keep it off the event loop.
+    system_prompt = await asyncio.to_thread(build_system_prompt, persona_name)
+    return await query_llm(model, system_prompt, question, context, use_cache=use_cache)
 
 
-async def _consensus_review(persona_name: str, question: str, context: Optional[str] = None) -> str:
+async def _consensus_review(
+    persona_name: str, question: str, context: Optional[str] = None, use_cache: bool = True
+) -> str:
     """Multi-LLM consensus review (Reviewer's specialty)."""
     config = get_persona_config(persona_name)
     models = config.get("models", ["anthropic/claude-3.5-sonnet", "openai/gpt-4o"])
-    system_prompt = build_system_prompt(persona_name)
+    system_prompt = await asyncio.to_thread(build_system_prompt, persona_name)
 
-    tasks = [query_llm(m, system_prompt, question, context) for m in models]
+    tasks = [query_llm(m, system_prompt, question, context, use_cache=use_cache) for m in models]
     responses = await asyncio.gather(*tasks, return_exceptions=True)
 
     emoji = config.get("emoji", "👁️")
@@ -132,51 +361,83 @@ async def _consensus_review(persona_name: str, question: str, context: Optional[
     return result
 
 
+# (keywords dict, matcher) for the routing table the matcher was built from.
+_router: tuple[dict[str, Any], Callable[[str], Any]] | None = None
+
+
+def _build_keyword_matcher(keywords: dict[str, Any]) -> Callable[[str], Any]:
+    """Compile routing keywords into a matcher returning the persona of the earliest-listed keyword found."""
+    if ahocorasick is None or not keywords:
+        table = [(str(keyword).lower(), persona) for keyword, persona in keywords.items()]
+        return lambda q: next((persona for keyword, persona in table if keyword in q), None)
+
+    automaton = ahocorasick.Automaton()
+    for index, (keyword, persona) in enumerate(keywords.items()):
+        automaton.add_word(str(keyword).lower(), (index, persona))
+    automaton.make_automaton()
+
+    def match(q: str) -> Any:
+        best = min((value for _, value in automaton.iter(q)), default=None, key=lambda v: v[0])
+        return best[1] if best else None
+
+    return match
+
+
+def _keyword_matcher() -> Callable[[str], Any]:
+    """Return the matcher for the current routing rules, rebuilding it when the rules are reloaded."""
+    global _router
+    keywords = get_routing_rules().get("keywords", {})
+    if _router is None or _router[0] is not keywords:
+        _router = (keywords, _build_keyword_matcher(keywords))
+    return _router[1]
+
+
 async def route_question(question: str) -> str:
     """Route a question to the appropriate persona using keyword matching."""
-    rules = get_routing_rules()
-    keywords = rules.get("keywords", {})
     q = question.lower()
-
-    for keyword, persona in keywords.items():
-        if keyword in q:
-            if isinstance(persona, list):
-                return persona[-1] if ("production" in q or "prod" in q) else persona[0]
-            return persona
-    return "reviewer"
+    persona = _keyword_matcher()(q)
+    if persona is None:
+        return "reviewer"
+    if isinstance(persona, list):
+        return persona[-1] if ("production" in q or "prod" in q) else persona[0]
+    return persona
 
 
 async def team_review(content: str, context: Optional[str] = None) -> dict[str, str]:
     """Run a parallel team review (Auditor, Sentinel, Architect)."""
-    personas_config = load_personas()
-    workflow = personas_config.get("workflows", {}).get("team_review", {})
-
-    tasks = {}
-    for name, prompt_suffix in workflow.get("personas", {}).items():
-        tasks[name] = consult_persona(name, f"{prompt_suffix}: {content}", context)
-
-    results = {}
-    responses = await asyncio.gather(*tasks.values(), return_exceptions=True)
-    for name, resp in zip(tasks.keys(), responses):
-        results[name] = f"Error: {resp}" if isinstance(resp, Exception) else resp
-    return results
+    reviewers = get_workflows().get("team_review", {}).get("personas", {})
+    responses = await asyncio.gather(
+        *(consult_persona(name, f"{prompt_suffix}: {content}", context) for name, prompt_suffix in reviewers.items()),
+        return_exceptions=True,
+    )
+    return {name: f"Error: {resp}" if isinstance(resp, Exception) else resp for name, resp in zip(reviewers, responses)}
 
 
 async def deployment_gate(deployment_plan: str, environment: str, context: Optional[str] = None) -> dict[str, Any]:
-    """Run a full deployment gate check with cost, security, and approval stages."""
+    """Run a full deployment gate check with cost, security, and approval stages.
+
+    Gate decisions bypass the local response cache so an approval is never replayed.
+    """
+    approver = "guardian" if environment.lower() == "production" else "tester"
     check_tasks = {
-        "auditor": consult_persona("auditor", f"Cost check for deployment: {deployment_plan}", context),
-        "sentinel": consult_persona("sentinel", f"Security check for deployment: {deployment_plan}", context),
+        "auditor": consult_persona(
+            "auditor", f"Cost check for deployment: {deployment_plan}", context, use_cache=False
+        ),
+        "sentinel": consult_persona(
+            "sentinel", f"Security check for deployment: {deployment_plan}", context, use_cache=False
+        ),
     }
-    check_responses = await asyncio.gather(*check_tasks.values(), return_exceptions=True)
+    # Build the approver's system prompt while the checks are in flight so the approval call starts immediately.
+    *check_responses, _ = await asyncio.gather(
+        *check_tasks.values(), asyncio.to_thread(build_system_prompt, approver), return_exceptions=True
+    )
     checks = dict(zip(check_tasks.keys(), check_responses))
 
-    approver = "guardian" if environment.lower() == "production" else "tester"
     approval_ctx = (
         f"Cost: {checks.get('auditor', 'Error')}\nSecurity: {checks.get('sentinel', 'Error')}\n{context or ''}"
     )
     approval = await consult_persona(
-        approver, f"Approve deployment to {environment}?\n\nPlan: {deployment_plan}", approval_ctx
+        approver, f"Approve deployment to {environment}?\n\nPlan: {deployment_plan}", approval_ctx, use_cache=False
     )
 
     return {"checks": checks, "approver": approver, "approval": approval, "environment": environment}
@@ -185,9 +446,9 @@ async def deployment_gate(deployment_plan: str, environment: str, context: Optio
 # Sync convenience wrappers
 def consult_sync(persona_name: str, question: str, context: Optional[str] = None) -> str:
     """Synchronous wrapper for consult_persona."""
-    return asyncio.run(consult_persona(persona_name, question, context))
+    return run_sync(consult_persona(persona_name, question, context))
 
 
 def team_review_sync(content: str, context: Optional[str] = None) -> dict[str, str]:
     """Synchronous wrapper for team_review."""
-    return asyncio.run(team_review(content, context))
+    return run_sync(team_review(content, context))
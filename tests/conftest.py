@@ -0,0 +1,87 @@
+"""Shared pytest fixtures."""
+
+import socket
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # optional; not available on Windows
+    uvloop = None
+
+from gatekeep.loader import load_all_for_persona, load_personas, reset_paths
+from gatekeep.personas import close_session
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _prewarm():
+    """Parse the bundled config once up front so individual tests hit the loader cache."""
+    for name in load_personas().get("personas", {}):
+        load_all_for_persona(name)
+
+
+@pytest.fixture(autouse=True)
+def _reset_paths():
+    """Re-resolve the config root per test; several tests change the working directory."""
+    reset_paths()
+    yield
+    reset_paths()
+
+
+def _fake_async(monkeypatch, target, ret):
+    """Replace an async function with a stub that records its calls and returns ``stub.ret``."""
+
+    async def stub(*args, **kwargs):
+        stub.calls.append((args, kwargs))
+        return stub.ret
+
+    stub.ret = ret
+    stub.calls = []
+    monkeypatch.setattr(target, stub)
+    return stub
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Stub out query_llm; set ``fake_llm.ret`` to change the reply."""
+    return _fake_async(monkeypatch, "gatekeep.personas.query_llm", "Mocked LLM response")
+
+
+@pytest.fixture
+def fake_consult(monkeypatch):
+    """Stub out consult_persona; set ``fake_consult.ret`` to change the reply."""
+    return _fake_async(monkeypatch, "gatekeep.personas.consult_persona", "Mocked persona response")
+
+
+@pytest.fixture
+async def stub_openrouter(monkeypatch):
+    """Serve a fake chat-completions endpoint on localhost and point query_llm at it."""
+    from aiohttp import web
+
+    seen = []
+
+    async def handler(request):
+        seen.append(await request.json())
+        return web.json_response({"choices": [{"message": {"content": "stubbed"}}]})
+
+    app = web.Application()
+    app.router.add_post("/chat", handler)
+    web_runner = web.AppRunner(app)
+    await web_runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    await web.SockSite(web_runner, sock).start()
+    monkeypatch.setattr("gatekeep.personas.OPENROUTER_URL", f"http://127.0.0.1:{port}/chat")
+    monkeypatch.setattr("gatekeep.personas._API_KEY", "test-key")
+    monkeypatch.setattr("gatekeep.cache._enabled", False)
+    yield seen
+    await close_session()
+    await web_runner.cleanup()
+
+
+if uvloop is not None:
+
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop when it is installed."""
+        return {"uvloop": uvloop.new_event_loop}
@@ -0,0 +1,110 @@
+"""Tests for the persistent LLM response cache."""
+
+import pytest
+
+from gatekeep import cache
+from gatekeep.personas import deployment_gate, query_llm
+
+
+@pytest.fixture(autouse=True)
+def cache_db(tmp_path, monkeypatch):
+    """Point the cache at a throwaway database."""
+    cache.close()
+    monkeypatch.setattr(cache, "CACHE_PATH", tmp_path / "cache.sqlite")
+    cache.set_enabled(True)
+    yield tmp_path / "cache.sqlite"
+    cache.close()
+    cache.set_enabled(True)
+
+
+# --- get / put ---
+
+
+def test_miss_returns_none():
+    assert cache.get("openai/gpt-4o", "system", "question") is None
+
+
+def test_put_then_get():
+    cache.put("openai/gpt-4o", "system", "question", "answer")
+    assert cache.get("openai/gpt-4o", "system", "question") == "answer"
+
+
+def test_key_includes_model_and_prompts():
+    cache.put("openai/gpt-4o", "system", "question", "answer")
+    assert cache.get("anthropic/claude-3.5-sonnet", "system", "question") is None
+    assert cache.get("openai/gpt-4o", "other system", "question") is None
+    assert cache.get("openai/gpt-4o", "system", "other question") is None
+
+
+def test_expired_entry_is_ignored():
+    cache.put("openai/gpt-4o", "system", "question", "answer", ttl=-1)
+    assert cache.get("openai/gpt-4o", "system", "question") is None
+
+
+def test_surrogate_escaped_prompt_is_cacheable():
+    message = b"caf\xe9".decode("utf-8", "surrogateescape")
+    cache.put("openai/gpt-4o", "system", message, "answer")
+    assert cache.get("openai/gpt-4o", "system", message) == "answer"
+
+
+def test_put_prunes_expired_entries():
+    cache.put("openai/gpt-4o", "system", "old", "stale", ttl=-1)
+    cache.put("openai/gpt-4o", "system", "new", "fresh")
+    assert cache.clear() == 1
+
+
+def test_disabled_cache_skips_reads_and_writes(cache_db):
+    cache.set_enabled(False)
+    cache.put("openai/gpt-4o", "system", "question", "answer")
+    assert not cache_db.exists()
+    assert cache.get("openai/gpt-4o", "system", "question") is None
+
+
+# --- clear ---
+
+
+def test_clear_without_database():
+    assert cache.clear() == 0
+
+
+def test_clear_removes_entries():
+    cache.put("openai/gpt-4o", "system", "q1", "a1")
+    cache.put("openai/gpt-4o", "system", "q2", "a2")
+    assert cache.clear() == 2
+    assert cache.get("openai/gpt-4o", "system", "q1") is None
+
+
+def test_clear_reports_unusable_database(cache_db):
+    cache_db.write_bytes(b"not a sqlite database" * 100)
+    with pytest.raises(RuntimeError, match="Could not clear"):
+        cache.clear()
+
+
+# --- query_llm integration ---
+
+
+async def test_query_llm_serves_cached_response(monkeypatch):
+    async def no_network():
+        raise AssertionError("cache hit should not open a session")
+
+    monkeypatch.setattr("gatekeep.personas._get_session", no_network)
+    cache.put("openai/gpt-4o", "system", "Context: ctx\n\nquestion", "cached answer")
+    assert await query_llm("openai/gpt-4o", "system", "question", "ctx") == "cached answer"
+
+
+async def test_unusable_cache_does_not_block_llm_call(stub_openrouter, tmp_path, monkeypatch):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(cache, "CACHE_PATH", blocker / "cache.sqlite")
+    cache.set_enabled(True)
+    assert await query_llm("openai/gpt-4o", "system", "question") == "stubbed"
+    assert len(stub_openrouter) == 1
+
+
+async def test_deployment_gate_bypasses_cache(stub_openrouter, cache_db):
+    cache.set_enabled(True)
+    await deployment_gate("API v2", "production")
+    calls = len(stub_openrouter)
+    await deployment_gate("API v2", "production")
+    assert len(stub_openrouter) == 2 * calls
+    assert cache.clear() == 0
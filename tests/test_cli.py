@@ -1,5 +1,7 @@
 """Tests for the CLI interface."""
 
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch, AsyncMock
 from click.testing import CliRunner
@@ -12,6 +14,12 @@ def runner():
     return CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def no_daemon(tmp_path, monkeypatch):
+    """Keep CLI tests in-process even if a real daemon is running."""
+    monkeypatch.setattr("gatekeep.daemon.SOCKET_DIR", tmp_path / "no-daemon")
+
+
 # --- personas command ---
 
 
@@ -41,6 +49,24 @@ def test_init_creates_files(runner, tmp_path):
         assert "initialized" in result.output.lower() or "Created" in result.output
 
 
+def test_init_precompiles_prompts(runner, tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path) as fs:
+        result = runner.invoke(cli, ["init"])
+        assert result.exit_code == 0
+        prompts_dir = Path(fs) / "governance" / ".prompts"
+        assert "Sentinel" in (prompts_dir / "sentinel.txt").read_text(encoding="utf-8")
+        assert (prompts_dir / "sentinel.hash").exists()
+
+
+def test_init_reports_incomplete_persona(runner, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "personas").mkdir()
+    (tmp_path / "personas" / "personas.yaml").write_text("personas:\n  broken:\n    domain: nothing\n")
+    result = runner.invoke(cli, ["init"])
+    assert result.exit_code == 0
+    assert "Skipped prompt for broken" in result.output
+
+
 def test_init_idempotent(runner, tmp_path):
     """Running init twice shouldn't fail."""
     with runner.isolated_filesystem(temp_dir=tmp_path):
@@ -50,6 +76,24 @@ def test_init_idempotent(runner, tmp_path):
         assert "already exists" in result.output or "skipping" in result.output.lower()
 
 
+# --- prompts command ---
+
+
+def test_prompts_rebuild_requires_init(runner, tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        result = runner.invoke(cli, ["prompts", "rebuild"])
+        assert result.exit_code != 0
+        assert "gatekeep init" in result.output
+
+
+def test_prompts_rebuild(runner, tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        runner.invoke(cli, ["init"])
+        result = runner.invoke(cli, ["prompts", "rebuild"])
+        assert result.exit_code == 0
+        assert "Rebuilt 8" in result.output
+
+
 # --- ask command ---
 
 
@@ -60,7 +104,7 @@ def test_ask_unknown_persona(runner):
 
 
 def test_ask_calls_persona(runner):
-    with patch("gatekeep.cli.consult_persona", new_callable=AsyncMock) as mock:
+    with patch("gatekeep.personas.consult_persona", new_callable=AsyncMock) as mock:
         mock.return_value = "Test response from Sentinel"
         result = runner.invoke(cli, ["ask", "sentinel", "Is this safe?"])
         assert result.exit_code == 0
@@ -71,7 +115,7 @@ def test_ask_calls_persona(runner):
 
 
 def test_review_calls_team(runner):
-    with patch("gatekeep.cli.team_review", new_callable=AsyncMock) as mock:
+    with patch("gatekeep.personas.team_review", new_callable=AsyncMock) as mock:
         mock.return_value = {
             "auditor": "Cost looks fine",
             "sentinel": "Security OK",
@@ -91,7 +135,7 @@ def test_deploy_requires_env(runner):
 
 
 def test_deploy_calls_gate(runner):
-    with patch("gatekeep.cli.deployment_gate", new_callable=AsyncMock) as mock:
+    with patch("gatekeep.personas.deployment_gate", new_callable=AsyncMock) as mock:
         mock.return_value = {
             "checks": {"auditor": "OK", "sentinel": "OK"},
             "approver": "guardian",
@@ -107,13 +151,50 @@ def test_deploy_calls_gate(runner):
 
 
 def test_route_calls_router(runner):
-    with patch("gatekeep.cli.route_question", new_callable=AsyncMock) as mock:
+    with patch("gatekeep.personas.route_question", new_callable=AsyncMock) as mock:
         mock.return_value = "sentinel"
         result = runner.invoke(cli, ["route", "security question"])
         assert result.exit_code == 0
         assert "Sentinel" in result.output
 
 
+# --- cache command ---
+
+
+def test_cache_clear(runner, tmp_path, monkeypatch):
+    from gatekeep import cache
+
+    cache.close()
+    monkeypatch.setattr(cache, "CACHE_PATH", tmp_path / "cache.sqlite")
+    cache.put("openai/gpt-4o", "system", "question", "answer")
+    result = runner.invoke(cli, ["cache", "clear"])
+    cache.close()
+    assert result.exit_code == 0
+    assert "Cleared 1" in result.output
+
+
+def test_cache_clear_unusable_database(runner, tmp_path, monkeypatch):
+    from gatekeep import cache
+
+    cache.close()
+    db = tmp_path / "cache.sqlite"
+    db.write_bytes(b"not a sqlite database" * 100)
+    monkeypatch.setattr(cache, "CACHE_PATH", db)
+    result = runner.invoke(cli, ["cache", "clear"])
+    cache.close()
+    assert result.exit_code == 1
+    assert "Could not clear" in result.output
+
+
+# --- daemon command ---
+
+
+def test_daemon_stop_without_daemon(runner):
+    result = runner.invoke(cli, ["daemon", "stop"])
+    assert result.exit_code == 0
+    assert "No daemon running" in result.output
+
+
 # --- version ---
 
 
@@ -121,3 +202,25 @@ def test_version(runner):
     result = runner.invoke(cli, ["--version"])
     assert result.exit_code == 0
     assert "1.0.0" in result.output
+
+
+def test_version_skips_runtime_modules():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from gatekeep.cli import cli\n"
+        "cli(['--version'], standalone_mode=False)\n"
+        "print(sorted(m for m in ('gatekeep.cache', 'gatekeep.daemon', 'gatekeep.personas') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+def test_package_exports_resolve_lazily():
+    import gatekeep
+    from gatekeep import personas
+
+    assert gatekeep.consult_persona is personas.consult_persona
+    assert not hasattr(gatekeep, "no_such_export")
@@ -0,0 +1,186 @@
+"""Tests for the background daemon and its socket client."""
+
+import asyncio
+import os
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from gatekeep import daemon
+
+pytestmark = pytest.mark.skipif(not daemon.is_supported(), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def socket_dir(monkeypatch):
+    """Use a short-lived socket directory; Unix socket paths have a tight length limit."""
+    with tempfile.TemporaryDirectory(prefix="gk") as d:
+        monkeypatch.setattr(daemon, "SOCKET_DIR", Path(d))
+        yield Path(d)
+
+
+@pytest.fixture
+async def running_daemon(socket_dir):
+    server = asyncio.create_task(daemon.serve())
+    for _ in range(100):
+        if daemon.socket_path().exists():
+            break
+        await asyncio.sleep(0.01)
+    yield
+    if not server.done():
+        await asyncio.to_thread(daemon.stop)
+    await server
+
+
+# --- client without a daemon ---
+
+
+def test_call_without_daemon_raises_connection_error(socket_dir):
+    with pytest.raises(ConnectionError):
+        daemon.call("ping")
+
+
+def test_is_running_false_without_daemon(socket_dir):
+    assert daemon.is_running() is False
+
+
+def test_socket_path_depends_on_cwd(socket_dir, tmp_path, monkeypatch):
+    here = daemon.socket_path()
+    monkeypatch.chdir(tmp_path)
+    assert daemon.socket_path() != here
+    assert daemon.socket_path().parent == socket_dir
+
+
+@pytest.fixture
+def fake_daemon(socket_dir):
+    """Listen on the daemon socket and answer one request with the given bytes."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(daemon.socket_path()))
+    server.listen(1)
+    threads = []
+
+    def start(reply: bytes | None) -> None:
+        def answer():
+            conn, _ = server.accept()
+            with conn:
+                conn.recv(1024)
+                if reply is None:
+                    conn.recv(1024)  # Hold the connection open until the client gives up
+                else:
+                    conn.sendall(reply)
+
+        thread = threading.Thread(target=answer)
+        thread.start()
+        threads.append(thread)
+
+    yield start
+    for thread in threads:
+        thread.join()
+    server.close()
+
+
+def test_malformed_reply_means_not_running(fake_daemon):
+    fake_daemon(b"not json\n")
+    assert daemon.is_running() is False
+
+
+def test_reply_timeout_raises_runtime_error(fake_daemon, monkeypatch):
+    monkeypatch.setattr(daemon, "REPLY_TIMEOUT", 0.1)
+    fake_daemon(None)
+    with pytest.raises(RuntimeError, match="timed out"):
+        daemon.call("ping")
+
+
+def test_cli_does_not_rerun_after_daemon_accepted(fake_daemon, monkeypatch):
+    from gatekeep import cli
+
+    def run_in_process(method):
+        raise AssertionError("workflow must not run again in-process")
+
+    monkeypatch.setattr(daemon, "get_methods", lambda: {"route": run_in_process})
+    fake_daemon(b"")
+    with pytest.raises(RuntimeError, match="closed the connection"):
+        cli._run("route", question="Hello?")
+
+
+# --- round trips ---
+
+
+async def test_ping(running_daemon):
+    assert await asyncio.to_thread(daemon.is_running)
+
+
+async def test_route_runs_in_daemon(running_daemon):
+    result = await asyncio.to_thread(daemon.call, "route", question="What will this cost?")
+    assert result == "auditor"
+
+
+async def test_ask_runs_in_daemon(running_daemon, fake_llm):
+    fake_llm.ret = "Daemon response"
+    result = await asyncio.to_thread(daemon.call, "ask", persona_name="sentinel", question="Is this safe?")
+    assert result == "Daemon response"
+
+
+@pytest.fixture
+def empty_project(tmp_path, monkeypatch):
+    """An empty working directory for the daemon to serve."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+async def test_init_after_start_is_picked_up(empty_project, running_daemon):
+    assert await asyncio.to_thread(daemon.call, "route", question="zebra question") == "reviewer"
+    await asyncio.to_thread(
+        subprocess.run,
+        [sys.executable, "-c", "from gatekeep.cli import cli; cli(['init'])"],
+        cwd=empty_project,
+        capture_output=True,
+        check=True,
+    )
+    personas_file = empty_project / "personas" / "personas.yaml"
+    text = personas_file.read_text()
+    personas_file.write_text(text.replace('    cost: "auditor"', '    zebra: "auditor"\n    cost: "auditor"', 1))
+    assert await asyncio.to_thread(daemon.call, "route", question="zebra question") == "auditor"
+
+
+async def test_method_errors_raise_runtime_error(running_daemon):
+    with pytest.raises(RuntimeError, match="Unknown persona"):
+        await asyncio.to_thread(daemon.call, "ask", persona_name="nobody", question="Hello?")
+
+
+async def test_unknown_method(running_daemon):
+    with pytest.raises(RuntimeError, match="Unknown method"):
+        await asyncio.to_thread(daemon.call, "explode")
+
+
+async def test_socket_is_private(socket_dir, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_DIR", socket_dir / "new")
+    umask = os.umask(0)  # read the current umask
+    os.umask(umask)
+    server = asyncio.create_task(daemon.serve())
+    for _ in range(100):
+        if daemon.socket_path().exists():
+            break
+        await asyncio.sleep(0.01)
+    try:
+        assert stat.S_IMODE(daemon.SOCKET_DIR.stat().st_mode) == 0o700
+        assert stat.S_IMODE(daemon.socket_path().stat().st_mode) == 0o600
+        assert os.umask(umask) == umask  # restored after binding
+    finally:
+        await asyncio.to_thread(daemon.stop)
+        await server
+
+
+async def test_shutdown_removes_socket(running_daemon):
+    await asyncio.to_thread(daemon.stop)
+    for _ in range(100):
+        if not daemon.socket_path().exists():
+            break
+        await asyncio.sleep(0.01)
+    assert not daemon.socket_path().exists()
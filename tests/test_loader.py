@@ -1,10 +1,14 @@
 """Tests for the governance/standards/persona loader."""
 
 import pytest
-from pathlib import Path
+import yaml
 
+from gatekeep import loader
 from gatekeep.loader import (
+    clear_cache,
     load_yaml,
+    reset_paths,
+    sources_signature,
     load_governance,
     load_standard,
     load_personas,
@@ -12,6 +16,7 @@ from gatekeep.loader import (
     get_persona_config,
     get_persona_governance,
     get_persona_standards,
+    get_persona_sources,
     format_governance_for_prompt,
     format_standards_for_prompt,
     get_routing_rules,
@@ -23,20 +28,61 @@ from gatekeep.loader import (
 # --- Fixtures ---
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def pkg_root():
     """Path to the bundled package config."""
-    return Path(__file__).parent.parent / "src" / "gatekeep"
+    return loader._PKG_DIR
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def personas_data():
     return load_personas()
 
 
+@pytest.fixture(scope="session")
+def governance_security():
+    return load_governance(["security.yaml"])
+
+
+@pytest.fixture(scope="session")
+def std_owasp():
+    return load_standard("owasp-top10")
+
+
+@pytest.fixture(scope="session")
+def std_cis():
+    return load_standard("cis-aws-2.0")
+
+
+@pytest.fixture(scope="session")
+def std_gdpr():
+    return load_standard("gdpr")
+
+
+@pytest.fixture(scope="session")
+def sentinel_gov():
+    return get_persona_governance("sentinel")
+
+
+@pytest.fixture(scope="session")
+def sentinel_std():
+    return get_persona_standards("sentinel")
+
+
+@pytest.fixture(scope="session")
+def versions():
+    return load_versions()
+
+
 # --- load_yaml ---
 
 
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML built without libyaml")
+def test_yaml_uses_c_loader():
+    assert loader._Loader is yaml.CSafeLoader
+    assert loader._Dumper is yaml.CSafeDumper
+
+
 def test_load_yaml_missing_file(tmp_path):
     result = load_yaml(tmp_path / "nope.yaml")
     assert result == {}
@@ -55,6 +101,101 @@ def test_load_yaml_valid(tmp_path):
     assert result == {"key": "value", "list": ["a", "b"]}
 
 
+def test_load_yaml_is_memoized(tmp_path):
+    f = tmp_path / "cached.yaml"
+    f.write_text("key: value\n")
+    assert load_yaml(f) is load_yaml(f)
+
+
+def test_load_yaml_reloads_on_change(tmp_path):
+    f = tmp_path / "changing.yaml"
+    f.write_text("key: value\n")
+    assert load_yaml(f) == {"key": "value"}
+    f.write_text("key: other value\n")
+    assert load_yaml(f) == {"key": "other value"}
+
+
+def test_clear_cache(tmp_path):
+    f = tmp_path / "cleared.yaml"
+    f.write_text("key: value\n")
+    first = load_yaml(f)
+    clear_cache()
+    second = load_yaml(f)
+    assert first == second
+    assert first is not second
+
+
+# --- bundled snapshot ---
+
+
+def test_snapshot_matches_bundled_yaml(pkg_root):
+    """Fails when bundled YAML changed without re-running scripts/precompile_configs.py."""
+    import hashlib
+
+    snapshot = loader._snapshot()
+    for path in pkg_root.rglob("*.yaml"):
+        rel = path.relative_to(pkg_root).as_posix()
+        raw = path.read_bytes()
+        assert rel in snapshot, f"{rel} missing from snapshot"
+        assert snapshot[rel][0] == hashlib.blake2b(raw).hexdigest(), f"{rel} snapshot is stale"
+        assert snapshot[rel][1] == (yaml.load(raw, Loader=loader._Loader) or {}), f"{rel} snapshot document differs"
+
+
+@pytest.mark.parametrize("content", [b"not json", b"[]", b'{"a.yaml": 1}', b'{"a.yaml": ["digest"]}'])
+def test_malformed_snapshot_falls_back_to_parsing(tmp_path, monkeypatch, content):
+    bad = tmp_path / "_configs.json"
+    bad.write_bytes(content)
+    monkeypatch.setattr(loader, "_SNAPSHOT_PATH", bad)
+    loader._snapshot.cache_clear()
+    try:
+        assert loader._snapshot() == {}
+    finally:
+        loader._snapshot.cache_clear()
+
+
+def test_parse_yaml_uses_snapshot_when_digest_matches(tmp_path, monkeypatch):
+    import hashlib
+
+    f = tmp_path / "doc.yaml"
+    f.write_text("source: file\n")
+    digest = hashlib.blake2b(f.read_bytes()).hexdigest()
+    monkeypatch.setattr(loader, "_PKG_DIR", tmp_path)
+    monkeypatch.setattr(loader, "_snapshot", lambda: {"doc.yaml": (digest, {"source": "snapshot"})})
+    assert loader._parse_yaml(f) == {"source": "snapshot"}
+
+
+def test_parse_yaml_ignores_stale_snapshot(tmp_path, monkeypatch):
+    f = tmp_path / "doc.yaml"
+    f.write_text("source: file\n")
+    monkeypatch.setattr(loader, "_PKG_DIR", tmp_path)
+    monkeypatch.setattr(loader, "_snapshot", lambda: {"doc.yaml": ("stale", {"source": "snapshot"})})
+    assert loader._parse_yaml(f) == {"source": "file"}
+
+
+def test_project_copy_of_bundled_yaml_is_parsed(tmp_path, pkg_root):
+    bundled = pkg_root / "governance" / "security.yaml"
+    copy = tmp_path / "governance" / "security.yaml"
+    copy.parent.mkdir()
+    copy.write_bytes(bundled.read_bytes())
+    parsed = loader._parse_yaml(copy)
+    assert parsed == loader._parse_yaml(bundled)
+    assert parsed is not loader._parse_yaml(bundled)
+
+
+# --- config root ---
+
+
+def test_config_root_is_cached_until_reset(tmp_path, monkeypatch):
+    bundled = load_personas()
+    (tmp_path / "governance").mkdir()
+    (tmp_path / "personas").mkdir()
+    (tmp_path / "personas" / "personas.yaml").write_text("personas: {}\n")
+    monkeypatch.chdir(tmp_path)
+    assert load_personas() is bundled
+    reset_paths()
+    assert load_personas() == {"personas": {}}
+
+
 # --- load_personas ---
 
 
@@ -63,17 +204,23 @@ def test_load_personas_returns_dict(personas_data):
     assert "personas" in personas_data
 
 
-def test_all_expected_personas_exist(personas_data):
-    expected = {"guide", "reviewer", "auditor", "sentinel", "architect", "tester", "guardian", "observer"}
-    actual = set(personas_data["personas"].keys())
-    assert expected == actual
+EXPECTED_PERSONAS = ["guide", "reviewer", "auditor", "sentinel", "architect", "tester", "guardian", "observer"]
+
+
+@pytest.mark.parametrize("name", EXPECTED_PERSONAS)
+def test_all_expected_personas_exist(name, personas_data):
+    assert name in personas_data["personas"]
+
 
+def test_no_unexpected_personas(personas_data):
+    assert set(personas_data["personas"]) == set(EXPECTED_PERSONAS)
 
-def test_persona_has_required_fields(personas_data):
+
+@pytest.mark.parametrize("name", EXPECTED_PERSONAS)
+def test_persona_has_required_fields(name, personas_data):
     required = {"character", "domain", "role", "model", "emoji", "traits"}
-    for name, config in personas_data["personas"].items():
-        missing = required - set(config.keys())
-        assert not missing, f"Persona '{name}' missing fields: {missing}"
+    missing = required - set(personas_data["personas"][name].keys())
+    assert not missing, f"Persona '{name}' missing fields: {missing}"
 
 
 # --- get_persona_config ---
@@ -93,10 +240,9 @@ def test_get_persona_config_unknown():
 # --- load_governance ---
 
 
-def test_load_governance_security():
-    gov = load_governance(["security.yaml"])
-    assert "security.yaml" in gov
-    assert "principles" in gov["security.yaml"]
+def test_load_governance_security(governance_security):
+    assert "security.yaml" in governance_security
+    assert "principles" in governance_security["security.yaml"]
 
 
 def test_load_governance_all_files():
@@ -112,23 +258,20 @@ def test_load_governance_missing_file():
 # --- load_standard ---
 
 
-def test_load_standard_owasp():
-    std = load_standard("owasp-top10")
-    assert "manifest" in std
-    assert "domains" in std
-    assert std["manifest"]["standard"]["id"] == "owasp-top10"
+def test_load_standard_owasp(std_owasp):
+    assert "manifest" in std_owasp
+    assert "domains" in std_owasp
+    assert std_owasp["manifest"]["standard"]["id"] == "owasp-top10"
 
 
-def test_load_standard_cis():
-    std = load_standard("cis-aws-2.0")
-    assert "manifest" in std
-    assert "iam" in std["domains"]
+def test_load_standard_cis(std_cis):
+    assert "manifest" in std_cis
+    assert "iam" in std_cis["domains"]
 
 
-def test_load_standard_gdpr():
-    std = load_standard("gdpr")
-    assert "manifest" in std
-    assert "data-protection" in std["domains"]
+def test_load_standard_gdpr(std_gdpr):
+    assert "manifest" in std_gdpr
+    assert "data-protection" in std_gdpr["domains"]
 
 
 def test_load_standard_unknown():
@@ -138,9 +281,8 @@ def test_load_standard_unknown():
 # --- get_persona_governance / standards ---
 
 
-def test_sentinel_has_security_governance():
-    gov = get_persona_governance("sentinel")
-    assert "security.yaml" in gov
+def test_sentinel_has_security_governance(sentinel_gov):
+    assert "security.yaml" in sentinel_gov
 
 
 def test_auditor_has_cost_governance():
@@ -148,10 +290,9 @@ def test_auditor_has_cost_governance():
     assert "cost-control.yaml" in gov
 
 
-def test_sentinel_has_standards():
-    std = get_persona_standards("sentinel")
-    assert "cis-aws-2.0" in std
-    assert "owasp-top10" in std
+def test_sentinel_has_standards(sentinel_std):
+    assert "cis-aws-2.0" in sentinel_std
+    assert "owasp-top10" in sentinel_std
 
 
 def test_unknown_persona_governance():
@@ -169,13 +310,18 @@ def test_format_governance_empty():
     assert format_governance_for_prompt({}) == "No specific governance rules loaded."
 
 
-def test_format_governance_includes_content():
-    gov = load_governance(["security.yaml"])
-    text = format_governance_for_prompt(gov)
+def test_format_governance_includes_content(governance_security):
+    text = format_governance_for_prompt(governance_security)
     assert "security.yaml" in text
     assert len(text) > 100
 
 
+def test_format_governance_is_order_independent():
+    gov = load_governance(["security.yaml", "cost-control.yaml"])
+    reordered = dict(reversed(list(gov.items())))
+    assert format_governance_for_prompt(gov) == format_governance_for_prompt(reordered)
+
+
 # --- format_standards_for_prompt ---
 
 
@@ -183,12 +329,28 @@ def test_format_standards_empty():
     assert format_standards_for_prompt({}) == "No regulatory standards applicable."
 
 
-def test_format_standards_includes_controls():
-    std = get_persona_standards("sentinel")
-    text = format_standards_for_prompt(std)
+def test_format_standards_includes_controls(sentinel_std):
+    text = format_standards_for_prompt(sentinel_std)
     assert "OWASP" in text or "CIS" in text
 
 
+def test_format_standards_grouped_controls():
+    text = format_standards_for_prompt({"soc2": load_standard("soc2")})
+    assert "SOC2-CC1.1" in text
+
+
+def test_format_standards_caps_controls_per_domain():
+    controls = [{"id": f"C-{i}", "requirement": "r", "severity": "low"} for i in range(15)]
+    text = format_standards_for_prompt({"x": {"manifest": {}, "domains": {"d": {"controls": controls}}}})
+    assert "[C-9]" in text
+    assert "[C-10]" not in text
+
+
+def test_format_standards_is_order_independent(sentinel_std):
+    reordered = dict(reversed(list(sentinel_std.items())))
+    assert format_standards_for_prompt(sentinel_std) == format_standards_for_prompt(reordered)
+
+
 # --- routing ---
 
 
@@ -234,10 +396,37 @@ def test_load_all_unknown():
     assert load_all_for_persona("nobody") == {}
 
 
+def test_load_all_is_cached():
+    assert load_all_for_persona("sentinel") is load_all_for_persona("sentinel")
+
+
+def test_load_all_rebuilds_when_config_changes(tmp_path, monkeypatch):
+    (tmp_path / "governance").mkdir()
+    (tmp_path / "personas").mkdir()
+    personas_file = tmp_path / "personas" / "personas.yaml"
+    personas_file.write_text("personas:\n  solo: {emoji: A}\n")
+    monkeypatch.chdir(tmp_path)
+    first = load_all_for_persona("solo")
+    personas_file.write_text("personas:\n  solo: {emoji: BB}\n")
+    assert load_all_for_persona("solo")["config"]["emoji"] == "BB"
+    assert first["config"]["emoji"] == "A"
+
+
+# --- persona sources ---
+
+
+def test_sentinel_sources_cover_config_files():
+    names = {p.name for p in get_persona_sources("sentinel")}
+    assert {"personas.yaml", "security.yaml", "manifest.yaml", "iam.yaml"} <= names
+
+
+def test_sources_signature_missing_file(tmp_path):
+    assert sources_signature([tmp_path / "nope.yaml"]) == ((str(tmp_path / "nope.yaml"), 0, -1),)
+
+
 # --- load_versions ---
 
 
-def test_load_versions():
-    versions = load_versions()
+def test_load_versions(versions):
     assert "standards" in versions
     assert "owasp-top10" in versions["standards"]
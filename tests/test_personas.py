@@ -1,11 +1,29 @@
 """Tests for the persona engine — prompt building, routing, and workflow logic."""
 
+import asyncio
+import gc
+import json
+import threading
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
-from unittest.mock import AsyncMock, patch
+from click.testing import CliRunner
 
+from gatekeep.cli import cli
+from gatekeep.loader import get_routing_rules, reset_paths
 from gatekeep.personas import (
+    _build_keyword_matcher,
+    _get_session,
+    _json_dumps,
+    _system_message,
     build_system_prompt,
+    clear_prompt_cache,
+    close_session,
+    get_api_key,
+    query_llm,
     route_question,
+    write_prompt_files,
     consult_persona,
     team_review,
     deployment_gate,
@@ -14,6 +32,51 @@ from gatekeep.personas import (
 )
 
 
+# --- get_api_key ---
+
+
+@pytest.fixture
+def no_env_key(tmp_path, monkeypatch):
+    """Isolate get_api_key from the real environment, cwd, and home directory."""
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("pathlib.Path.home", lambda: tmp_path / "home")
+    return tmp_path
+
+
+def test_api_key_from_environment(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "env-key")
+    assert get_api_key() == "env-key"
+
+
+def test_api_key_from_dotenv(no_env_key):
+    (no_env_key / ".env").write_text('OTHER=1\nOPENROUTER_API_KEY="file-key"\r\n')
+    assert get_api_key() == "file-key"
+
+
+def test_api_key_skips_placeholder(no_env_key):
+    (no_env_key / ".env").write_text("OPENROUTER_API_KEY=your_openrouter_api_key_here\nOPENROUTER_API_KEY=real-key\n")
+    assert get_api_key() == "real-key"
+
+
+def test_api_key_prefers_local_dotenv(no_env_key):
+    (no_env_key / "home" / ".gatekeep").mkdir(parents=True)
+    (no_env_key / "home" / ".gatekeep" / ".env").write_text("OPENROUTER_API_KEY=home-key\n")
+    assert get_api_key() == "home-key"
+    (no_env_key / ".env").write_text("OPENROUTER_API_KEY=local-key\n")
+    assert get_api_key() == "local-key"
+
+
+def test_api_key_tolerates_non_utf8_dotenv(no_env_key):
+    (no_env_key / ".env").write_bytes(b"OPENROUTER_API_KEY=file-key\xe9\n")
+    assert get_api_key() == "file-key\ufffd"
+
+
+def test_api_key_missing_raises(no_env_key):
+    with pytest.raises(ValueError, match="OPENROUTER_API_KEY not found"):
+        get_api_key()
+
+
 # --- build_system_prompt ---
 
 
@@ -55,152 +118,344 @@ def test_build_prompt_reviewer_no_governance():
     assert "Reviewer" in prompt
 
 
+def test_build_prompt_guardian_includes_soc2():
+    prompt = build_system_prompt("guardian")
+    assert "SOC2-CC1.1" in prompt
+
+
+def test_build_prompt_is_memoized():
+    assert build_system_prompt("sentinel") is build_system_prompt("sentinel")
+
+
+def test_clear_prompt_cache():
+    first = build_system_prompt("sentinel")
+    clear_prompt_cache()
+    second = build_system_prompt("sentinel")
+    assert first == second
+    assert first is not second
+
+
+def test_build_prompt_unknown_is_not_cached():
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Unknown persona"):
+            build_system_prompt("nonexistent")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project with its own governance/ and precompiled prompts."""
+    monkeypatch.chdir(tmp_path)
+    CliRunner().invoke(cli, ["init"])
+    reset_paths()
+    clear_prompt_cache()
+    yield tmp_path
+    clear_prompt_cache()
+
+
+def test_precompiled_prompt_is_used(project):
+    (project / "governance" / ".prompts" / "sentinel.txt").write_text("precompiled", encoding="utf-8")
+    assert build_system_prompt("sentinel") == "precompiled"
+
+
+def test_stale_precompiled_prompt_is_ignored(project):
+    (project / "governance" / ".prompts" / "sentinel.txt").write_text("precompiled", encoding="utf-8")
+    (project / "governance" / ".prompts" / "sentinel.hash").write_text("stale", encoding="utf-8")
+    assert "Sentinel" in build_system_prompt("sentinel")
+
+
+def test_prompt_format_change_invalidates_precompiled(project, monkeypatch):
+    (project / "governance" / ".prompts" / "sentinel.txt").write_text("precompiled", encoding="utf-8")
+    monkeypatch.setattr("gatekeep.personas._PROMPT_FORMAT", -1)
+    assert "Sentinel" in build_system_prompt("sentinel")
+
+
+def test_write_prompt_files_skips_incomplete_persona(project):
+    personas_file = project / "personas" / "personas.yaml"
+    text = personas_file.read_text(encoding="utf-8")
+    personas_file.write_text(text.replace("\npersonas:\n", "\npersonas:\n  broken:\n    domain: nothing\n", 1))
+    written, skipped = write_prompt_files()
+    assert "sentinel" in written
+    assert "broken" in skipped and "character" in skipped["broken"]
+    assert not (project / "governance" / ".prompts" / "broken.txt").exists()
+
+
+def test_write_prompt_files_matches_built_prompt(project):
+    write_prompt_files()
+    text = (project / "governance" / ".prompts" / "auditor.txt").read_text(encoding="utf-8")
+    clear_prompt_cache()
+    (project / "governance" / ".prompts" / "auditor.hash").unlink()
+    assert build_system_prompt("auditor") == text
+
+
 # --- route_question ---
 
 
-@pytest.mark.asyncio
 async def test_route_security_to_sentinel():
     result = await route_question("Is this security configuration safe?")
     assert result == "sentinel"
 
 
-@pytest.mark.asyncio
 async def test_route_cost_to_auditor():
     result = await route_question("What will this cost?")
     assert result == "auditor"
 
 
-@pytest.mark.asyncio
 async def test_route_design_to_architect():
     result = await route_question("How should I design this API?")
     assert result == "architect"
 
 
-@pytest.mark.asyncio
 async def test_route_code_to_reviewer():
     result = await route_question("Can you review this code?")
     assert result == "reviewer"
 
 
-@pytest.mark.asyncio
 async def test_route_deploy_test():
     result = await route_question("Can I deploy to staging?")
     assert result == "tester"
 
 
-@pytest.mark.asyncio
 async def test_route_deploy_production():
     result = await route_question("Deploy to production please")
     assert result == "guardian"
 
 
-@pytest.mark.asyncio
 async def test_route_unknown_defaults_to_reviewer():
     result = await route_question("Something completely unrelated to any keyword")
     assert result == "reviewer"
 
 
+async def test_route_prefers_earlier_listed_keyword():
+    # "access" is listed before "accessibility" in the routing table
+    result = await route_question("Check accessibility of the login page")
+    assert result == "sentinel"
+
+
+def test_keyword_matchers_agree(monkeypatch):
+    keywords = get_routing_rules()["keywords"]
+    fast = _build_keyword_matcher(keywords)
+    monkeypatch.setattr("gatekeep.personas.ahocorasick", None)
+    linear = _build_keyword_matcher(keywords)
+    for keyword in keywords:
+        q = f"quick question about {keyword} here".lower()
+        assert fast(q) == linear(q), keyword
+
+
+async def test_route_without_ahocorasick(monkeypatch):
+    monkeypatch.setattr("gatekeep.personas.ahocorasick", None)
+    monkeypatch.setattr("gatekeep.personas._router", None)
+    assert await route_question("What will this cost?") == "auditor"
+    assert await route_question("Deploy to production please") == "guardian"
+    assert await route_question("Something completely unrelated to any keyword") == "reviewer"
+
+
 # --- consult_persona (mocked LLM) ---
 
 
-@pytest.mark.asyncio
-async def test_consult_persona_calls_llm():
-    with patch("gatekeep.personas.query_llm", new_callable=AsyncMock) as mock_llm:
-        mock_llm.return_value = "Mocked response from Sentinel"
-        result = await consult_persona("sentinel", "Is this safe?")
-        assert result == "Mocked response from Sentinel"
-        mock_llm.assert_called_once()
-        # Verify system prompt was built for sentinel
-        call_args = mock_llm.call_args
-        assert "sentinel" in call_args[0][1].lower() or "Sentinel" in call_args[0][1]
+async def test_consult_persona_calls_llm(fake_llm):
+    fake_llm.ret = "Mocked response from Sentinel"
+    result = await consult_persona("sentinel", "Is this safe?")
+    assert result == "Mocked response from Sentinel"
+    assert len(fake_llm.calls) == 1
+    # Verify system prompt was built for sentinel
+    args, _ = fake_llm.calls[0]
+    assert "sentinel" in args[1].lower() or "Sentinel" in args[1]
 
 
-@pytest.mark.asyncio
-async def test_consult_persona_with_context():
-    with patch("gatekeep.personas.query_llm", new_callable=AsyncMock) as mock_llm:
-        mock_llm.return_value = "Response with context"
-        result = await consult_persona("auditor", "Cost?", context="Lambda 256MB")
-        assert result == "Response with context"
-        mock_llm.assert_called_once()
+async def test_consult_persona_with_context(fake_llm):
+    fake_llm.ret = "Response with context"
+    result = await consult_persona("auditor", "Cost?", context="Lambda 256MB")
+    assert result == "Response with context"
+    assert len(fake_llm.calls) == 1
 
 
-@pytest.mark.asyncio
 async def test_consult_unknown_persona_raises():
     with pytest.raises(ValueError, match="Unknown persona"):
         await consult_persona("nobody", "Hello?")
 
 
-@pytest.mark.asyncio
-async def test_consult_reviewer_uses_consensus():
+async def test_consult_reviewer_uses_consensus(monkeypatch):
     """Reviewer model is 'consensus' — should call _consensus_review."""
-    with patch("gatekeep.personas._consensus_review", new_callable=AsyncMock) as mock_consensus:
-        mock_consensus.return_value = "Consensus result"
-        result = await consult_persona("reviewer", "Review this code")
-        assert result == "Consensus result"
-        mock_consensus.assert_called_once()
+    calls = []
+
+    async def fake_consensus(*args):
+        calls.append(args)
+        return "Consensus result"
+
+    monkeypatch.setattr("gatekeep.personas._consensus_review", fake_consensus)
+    result = await consult_persona("reviewer", "Review this code")
+    assert result == "Consensus result"
+    assert len(calls) == 1
 
 
 # --- team_review (mocked) ---
 
 
-@pytest.mark.asyncio
-async def test_team_review_returns_all_personas():
-    with patch("gatekeep.personas.consult_persona", new_callable=AsyncMock) as mock_consult:
-        mock_consult.return_value = "Looks good"
-        results = await team_review("New payment API")
-        # Should have auditor, sentinel, architect
-        assert "auditor" in results
-        assert "sentinel" in results
-        assert "architect" in results
+async def test_team_review_returns_all_personas(fake_consult):
+    fake_consult.ret = "Looks good"
+    results = await team_review("New payment API")
+    # Should have auditor, sentinel, architect
+    assert "auditor" in results
+    assert "sentinel" in results
+    assert "architect" in results
 
 
-@pytest.mark.asyncio
-async def test_team_review_handles_errors():
+async def test_team_review_handles_errors(monkeypatch):
     async def side_effect(name, question, context=None):
         if name == "sentinel":
             raise RuntimeError("API error")
         return "OK"
 
-    with patch("gatekeep.personas.consult_persona", side_effect=side_effect):
-        results = await team_review("Test content")
-        assert "Error" in results["sentinel"]
-        assert results["auditor"] == "OK"
+    monkeypatch.setattr("gatekeep.personas.consult_persona", side_effect)
+    results = await team_review("Test content")
+    assert "Error" in results["sentinel"]
+    assert results["auditor"] == "OK"
+
+
+async def test_team_review_consults_concurrently(monkeypatch):
+    started = []
+    release = asyncio.Event()
+
+    async def side_effect(name, question, context=None):
+        started.append(name)
+        if len(started) == 3:
+            release.set()
+        # Each consult waits until all three are in flight; sequential awaits would time out.
+        await asyncio.wait_for(release.wait(), timeout=1)
+        return "OK"
+
+    monkeypatch.setattr("gatekeep.personas.consult_persona", side_effect)
+    results = await team_review("Test content")
+    assert results == {"auditor": "OK", "sentinel": "OK", "architect": "OK"}
 
 
 # --- deployment_gate (mocked) ---
 
 
-@pytest.mark.asyncio
-async def test_deployment_gate_production():
-    with patch("gatekeep.personas.consult_persona", new_callable=AsyncMock) as mock_consult:
-        mock_consult.return_value = "Approved"
-        result = await deployment_gate("API v2", "production")
-        assert result["environment"] == "production"
-        assert result["approver"] == "guardian"
-        assert "checks" in result
-        assert "approval" in result
+async def test_deployment_gate_production(fake_consult):
+    fake_consult.ret = "Approved"
+    result = await deployment_gate("API v2", "production")
+    assert result["environment"] == "production"
+    assert result["approver"] == "guardian"
+    assert "checks" in result
+    assert "approval" in result
+
+
+async def test_deployment_gate_test(fake_consult):
+    fake_consult.ret = "Ship it"
+    result = await deployment_gate("API v2", "test")
+    assert result["approver"] == "tester"
+
+
+# --- prompt caching ---
+
+
+def test_system_message_marks_anthropic_cacheable():
+    msg = _system_message("anthropic/claude-3.5-sonnet", "prompt", prompt_cache=True)
+    assert msg["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert msg["content"][0]["text"] == "prompt"
+
+
+def test_system_message_plain_for_other_providers():
+    assert _system_message("openai/gpt-4o", "prompt", prompt_cache=True) == {"role": "system", "content": "prompt"}
+
+
+def test_system_message_cache_disabled():
+    msg = _system_message("anthropic/claude-3.5-sonnet", "prompt", prompt_cache=False)
+    assert msg == {"role": "system", "content": "prompt"}
+
+
+# --- shared session ---
+
+
+async def test_session_is_shared_until_closed(monkeypatch):
+    monkeypatch.setattr("gatekeep.personas._API_KEY", "test-key")
+    first = await _get_session()
+    assert await _get_session() is first
+    await close_session()
+    assert first.closed
+    second = await _get_session()
+    assert second is not first
+    await close_session()
+
+
+# --- query_llm (local stub server) ---
+
+
+@pytest.fixture
+def threaded_openrouter(monkeypatch):
+    """Serve a fake keep-alive chat endpoint from a thread, for tests that run their own event loops."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = b'{"choices": [{"message": {"content": "stubbed"}}]}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr("gatekeep.personas.OPENROUTER_URL", f"http://127.0.0.1:{server.server_port}/chat")
+    monkeypatch.setattr("gatekeep.personas._API_KEY", "test-key")
+    monkeypatch.setattr("gatekeep.cache._enabled", False)
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_caller_asyncio_run_closes_session(threaded_openrouter):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for _ in range(2):
+            assert asyncio.run(query_llm("openai/gpt-4o", "system", "question")) == "stubbed"
+        gc.collect()
+    leaks = [w for w in caught if issubclass(w.category, ResourceWarning)]
+    assert not leaks, [str(w.message) for w in leaks]
+
+
+async def test_query_llm_round_trip(stub_openrouter):
+    result = await query_llm("openai/gpt-4o", "system", "question", "ctx")
+    assert result == "stubbed"
+    messages = stub_openrouter[0]["messages"]
+    assert messages[0] == {"role": "system", "content": "system"}
+    assert messages[1] == {"role": "user", "content": "Context: ctx\n\nquestion"}
+
+
+async def test_query_llm_round_trip_without_orjson(stub_openrouter, monkeypatch):
+    monkeypatch.setattr("gatekeep.personas.orjson", None)
+    assert await query_llm("openai/gpt-4o", "system", "question") == "stubbed"
+    assert stub_openrouter[0]["model"] == "openai/gpt-4o"
+
+
+def test_json_dumps_falls_back_for_orjson_rejects():
+    body = {1: "one", "text": "lone \ud800 surrogate"}
+    assert json.loads(_json_dumps(body)) == {"1": "one", "text": "lone \ud800 surrogate"}
 
 
-@pytest.mark.asyncio
-async def test_deployment_gate_test():
-    with patch("gatekeep.personas.consult_persona", new_callable=AsyncMock) as mock_consult:
-        mock_consult.return_value = "Ship it"
-        result = await deployment_gate("API v2", "test")
-        assert result["approver"] == "tester"
+async def test_query_llm_round_trip_with_lone_surrogate(stub_openrouter):
+    question = b"caf\xe9".decode("utf-8", "surrogateescape")
+    assert await query_llm("openai/gpt-4o", "system", question) == "stubbed"
+    assert stub_openrouter[0]["messages"][1]["content"] == question
 
 
 # --- sync wrappers ---
 
 
-def test_consult_sync():
-    with patch("gatekeep.personas.query_llm", new_callable=AsyncMock) as mock_llm:
-        mock_llm.return_value = "Sync response"
-        result = consult_sync("sentinel", "Is this safe?")
-        assert result == "Sync response"
+def test_consult_sync(fake_llm):
+    fake_llm.ret = "Sync response"
+    result = consult_sync("sentinel", "Is this safe?")
+    assert result == "Sync response"
 
 
-def test_team_review_sync():
-    with patch("gatekeep.personas.consult_persona", new_callable=AsyncMock) as mock_consult:
-        mock_consult.return_value = "OK"
-        results = team_review_sync("Content")
-        assert isinstance(results, dict)
+def test_team_review_sync(fake_consult):
+    fake_consult.ret = "OK"
+    results = team_review_sync("Content")
+    assert isinstance(results, dict)